@@ -1,5 +1,8 @@
+import numpy as np
+import shapely
+
 from math import (
-    radians, degrees, sin, cos, atan2, pi)
+    radians, degrees, sin, cos, atan2, hypot, pi)
 
 from shapely.geometry import Point, LineString
 
@@ -64,16 +67,40 @@ def angle_between_points(p0: Union[Point, tuple[float,float]],
         The angle, in radians, is normalized to be in the range [ -Pi, Pi ].
 
     """
-    if isinstance(p0, Point) and isinstance(p1, Point):
-        dx = p1.x - p0.x
-        dy = p1.y - p0.y
-    elif isinstance(p0, tuple) and isinstance(p1, tuple):
-        dx = p1[0] - p0[0]
-        dy = p1[1] - p0[1]
-    else:
+    # Index rather than unpack so (x,y,z) tuples, e.g. from the coords 
+    # of a 3D line, work too.
+    try:
+        x0, y0 = (p0.x, p0.y) if hasattr(p0, 'x') else (p0[0], p0[1])
+        x1, y1 = (p1.x, p1.y) if hasattr(p1, 'x') else (p1[0], p1[1])
+    except (TypeError, IndexError):
         raise TypeError('p0 and p1 must be shapely.geometry.Point or (x,y) tuples')
 
-    return atan2(dy,dx)
+    return atan2(y1 - y0, x1 - x0)
+
+def angle_between_points_array(p0_xy: np.ndarray, 
+                               p1_xy: np.ndarray) -> np.ndarray:
+    """
+    The angle of the vectors from points p0_xy to p1_xy, relative to the 
+    positive x-axis. The same as angle_between_points, but for many 
+    points at once.
+
+    Parameters
+    ----------
+    p0_xy : np.ndarray
+        Array of shape (N,2) of x,y coordinates
+    p1_xy : np.ndarray
+        Array of shape (N,2) of x,y coordinates
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (N,) of angles, in radians, normalized to be in 
+        the range [ -Pi, Pi ].
+
+    """
+    p0_xy = np.asarray(p0_xy, dtype=np.float64)
+    p1_xy = np.asarray(p1_xy, dtype=np.float64)
+    return np.arctan2(p1_xy[:,1] - p0_xy[:,1], p1_xy[:,0] - p0_xy[:,0])
 
 def angle_diff(angle1:float, angle2:float) -> float:
     """
@@ -129,6 +156,12 @@ def angle_between_vectors(start_point:Union[Point, tuple[float,float]], middle_p
     
     return angle_diff(angle1, angle2)
 
+def _sincos(angle:float) -> tuple[float, float]:
+    """ 
+    The sine and cosine of angle, in radians.
+    """
+    return sin(angle), cos(angle)
+
 def point_from_angle_and_distance(ref_point:Union[Point, tuple[float,float]], 
                                   angle:float, 
                                   distance:float, 
@@ -167,8 +200,9 @@ def point_from_angle_and_distance(ref_point:Union[Point, tuple[float,float]],
     if not use_radians:
         angle = degrees_to_radians(angle)
         
-    x_off = cos(angle) * distance
-    y_off = sin(angle) * distance
+    sin_angle, cos_angle = _sincos(angle)
+    x_off = cos_angle * distance
+    y_off = sin_angle * distance
     
     x_off = round(x_off, DECIMAL_PRECISION)
     y_off = round(y_off, DECIMAL_PRECISION)
@@ -176,6 +210,24 @@ def point_from_angle_and_distance(ref_point:Union[Point, tuple[float,float]],
     return Point((x1 + x_off, y1 + y_off))
     
     
+# For each attached option of the perpendicular line functions, the fraction
+# of the new line length on the counter-clockwise and clockwise sides of 
+# the ref_line.
+_ATTACHED_TABLE = {
+    'center' : (0.5, 0.5),
+    'left'   : (0.0, 1.0),
+    'right'  : (1.0, 0.0),
+    }
+
+def _attached_fractions(attached:str) -> tuple[float, float]:
+    """ 
+    The _ATTACHED_TABLE entry for attached, or a ValueError if it's not a valid option.
+    """
+    try:
+        return _ATTACHED_TABLE[attached]
+    except (KeyError, TypeError):
+        raise ValueError('attached must be left,right, or center')
+
 def perpendicular_line_at_endpoint(ref_line:LineString, 
                                    length:float, 
                                    location:str = 'end', 
@@ -217,46 +269,117 @@ def perpendicular_line_at_endpoint(ref_line:LineString,
     """
     if not isinstance(ref_line, LineString):
         raise TypeError('ref_line must be shapely LineString')
-        
+    if ref_line.has_z:
+        raise ValueError('ref_line must be 2D')
+    
+    # For a single line plain floats are much quicker than the numpy path
+    # in perpendicular_lines, the math is the same.
+    ref_coords = ref_line.coords
+    if len(ref_coords) < 2:
+        raise ValueError('ref_line must have at least 2 points')
+    
     # New perpendicular line will intersect at coord2
     if location == 'end':
-        coord1 = ref_line.coords[-2]
-        coord2 = ref_line.coords[-1] 
+        coord1 = ref_coords[-2]
+        coord2 = ref_coords[-1]
     elif location == 'start':
-        coord1 = ref_line.coords[1]
-        coord2 = ref_line.coords[0]
+        coord1 = ref_coords[1]
+        coord2 = ref_coords[0]
     else:
         raise ValueError('location must be start or end')
     
-    if attached == 'center':
-        first_point_distance = length/2
-        second_point_distance = length/2
-    elif attached == 'left':
-        first_point_distance = 0
-        second_point_distance = length
-    elif attached == 'right':
-        first_point_distance = length
-        second_point_distance = 0
+    first_frac, second_frac = _attached_fractions(attached)
+    first_point_distance = length * first_frac
+    second_point_distance = length * second_frac
+    
+    x, y = coord2[0], coord2[1]
+    dx = x - coord1[0]
+    dy = y - coord1[1]
+    segment_length = hypot(dx, dy)
+    if segment_length == 0:
+        cos_angle, sin_angle = 1.0, 0.0
     else:
-        raise ValueError('attached must be left,right, or center')
+        cos_angle, sin_angle = dx / segment_length, dy / segment_length
     
-    ref_line_angle = angle_between_points(coord1, coord2) # in radians
+    first_point = (x - sin_angle * first_point_distance, y + cos_angle * first_point_distance)
+    second_point = (x + sin_angle * second_point_distance, y - cos_angle * second_point_distance)
     
-    first_point = point_from_angle_and_distance(
-        ref_point = coord2,
-        angle = ref_line_angle + (pi/2),
-        distance = first_point_distance,
-        use_radians=True
-        )
-    second_point = point_from_angle_and_distance(
-        ref_point = coord2,
-        angle = ref_line_angle - (pi/2),
-        distance = second_point_distance,
-        use_radians=True
-        )
-
     return LineString([first_point, second_point])
+
+def perpendicular_lines(ref_lines: np.ndarray, 
+                        lengths: Union[float, np.ndarray], 
+                        location:str = 'end', 
+                        attached:str = 'center') -> np.ndarray:
+    """
+    Generate many new line segments, each perpendicular to a reference line.
+    The same as perpendicular_line_at_endpoint, but for many lines at once.
+
+    Parameters
+    ----------
+    ref_lines : np.ndarray
+        Array of N shapely lines, each with at least 2 points. A single
+        line is treated as an array of 1.
+    lengths : float or np.ndarray
+        Length of the new lines. Either a single length for all lines or 
+        an array of N lengths.
+    location : str
+        Either 'start' or 'end' for which line segment of each ref_line to 
+        calculate the 90 degree angle from.
+    attached : str
+        Either 'center', 'left', or 'right'. See perpendicular_line_at_endpoint.
+
+    Returns
+    -------
+    new_lines : np.ndarray
+        Array of N shapely LineStrings
+
+    """
+    ref_lines = np.atleast_1d(np.asarray(ref_lines, dtype=object))
+    # A LinearRing is a LineString too.
+    is_line = np.isin(shapely.get_type_id(ref_lines), [shapely.GeometryType.LINESTRING, shapely.GeometryType.LINEARRING])
+    if not np.all(is_line):
+        raise TypeError('ref_lines must be shapely LineStrings')
+    if np.any(shapely.has_z(ref_lines)):
+        raise ValueError('ref_lines must be 2D')
+    
+    n_coords = shapely.get_num_coordinates(ref_lines)
+    if np.any(n_coords < 2):
+        raise ValueError('ref_lines must have at least 2 points')
     
+    coords = shapely.get_coordinates(ref_lines)
+    line_start_i = np.cumsum(n_coords) - n_coords
+    
+    # New perpendicular lines will intersect at coord2
+    if location == 'end':
+        coord1 = coords[line_start_i + n_coords - 2]
+        coord2 = coords[line_start_i + n_coords - 1]
+    elif location == 'start':
+        coord1 = coords[line_start_i + 1]
+        coord2 = coords[line_start_i]
+    else:
+        raise ValueError('location must be start or end')
+    
+    first_frac, second_frac = _attached_fractions(attached)
+    lengths = np.broadcast_to(np.asarray(lengths, dtype=np.float64), n_coords.shape)
+    first_point_distance = lengths * first_frac
+    second_point_distance = lengths * second_frac
+    
+    # The cos and sin of the ref_line angle are the components of the unit
+    # vector from coord1 to coord2, so no angle is needed. A zero length 
+    # segment gets angle 0, the same as atan2(0,0).
+    dx, dy = (coord2 - coord1).T
+    segment_lengths = np.hypot(dx, dy)
+    is_zero_length = segment_lengths == 0
+    segment_lengths[is_zero_length] = 1
+    cos_angles = np.where(is_zero_length, 1, dx / segment_lengths)
+    sin_angles = dy / segment_lengths
+    
+    # Rotating by +pi/2 turns (cos, sin) into (-sin, cos), and by -pi/2 
+    # into (sin, -cos).
+    first_points = coord2 + first_point_distance[:, np.newaxis] * np.column_stack([-sin_angles, cos_angles])
+    second_points = coord2 + second_point_distance[:, np.newaxis] * np.column_stack([sin_angles, -cos_angles])
+    
+    return shapely.linestrings(np.stack([first_points, second_points], axis=1))
 
 def perpendicular_line_at_midpoint(ref_line:LineString, 
                                    length:float, 
@@ -319,33 +442,19 @@ def perpendicular_line_at_midpoint(ref_line:LineString,
     else:
         raise ValueError('location must be start or end')
     
-    if attached == 'center':
-        first_point_distance = length/2
-        second_point_distance = length/2
-    elif attached == 'left':
-        first_point_distance = 0
-        second_point_distance = length
-    elif attached == 'right':
-        first_point_distance = length
-        second_point_distance = 0
-    else:
-        raise ValueError('attached must be left,right, or center')
+    first_frac, second_frac = _attached_fractions(attached)
+    first_point_distance = length * first_frac
+    second_point_distance = length * second_frac
     
     ref_line_angle1 = angle_between_points(coord1, coord2) # in radians
     ref_line_angle2 = angle_between_points(coord2, coord3)
     ref_line_angle_avg = (ref_line_angle1 + ref_line_angle2) /2
     
-    first_point = point_from_angle_and_distance(
-        ref_point = coord2,
-        angle = ref_line_angle_avg + (pi/2),
-        distance = first_point_distance,
-        use_radians=True
-        )
-    second_point = point_from_angle_and_distance(
-        ref_point = coord2,
-        angle = ref_line_angle_avg - (pi/2),
-        distance = second_point_distance,
-        use_radians=True
-        )
+    # Rotating by +pi/2 turns (cos, sin) into (-sin, cos), and by -pi/2 
+    # into (sin, -cos). See perpendicular_lines.
+    x, y = coord2
+    sin_angle, cos_angle = _sincos(ref_line_angle_avg)
+    first_point = (x - sin_angle * first_point_distance, y + cos_angle * first_point_distance)
+    second_point = (x + sin_angle * second_point_distance, y - cos_angle * second_point_distance)
 
     return LineString([first_point, second_point])
@@ -1,13 +1,16 @@
 import numpy as np
+from math import ceil
 
+import shapely
 import shapely.geometry
-from shapely.geometry import box, MultiPolygon
-from shapely.ops import unary_union
+from shapely.geometry import MultiPolygon
 
-from scipy.sparse.csgraph import floyd_warshall
+from scipy.sparse.csgraph import dijkstra
 from scipy.sparse import csr_matrix
 from scipy import optimize
 
+from shapely_extra.utils import _prepared
+
 
 class BlockSplitter:
     def __init__(self, 
@@ -61,7 +64,6 @@ class BlockSplitter:
         block_size_x = (maxx - minx) * self.block_size
         block_size_y = (maxy - miny) * self.block_size
     
-        self.grid_shapes = []
         full_grid = self._make_regular_grid(
             minx = minx, 
             miny = miny, 
@@ -73,32 +75,48 @@ class BlockSplitter:
         # Cut down the  full grid to only those grid elements within the  
         # polygon. Cropping them where needed so that all the grid elements
         # put together will equal the original polygon.
-        for element in full_grid:
-            element = element.intersection(self.polygon)
-            if element.is_empty:
-                continue 
-            if element.geom_type=='Polygon':
-                self.grid_shapes.append(element)
-            elif element.geom_type=='MultiPolygon':
-                self.grid_shapes.extend(element.geoms)
-            else:
-                raise RuntimeError(f'cant handle geom_type {element.geom_type}')
+        # Elements entirely outside the polygon are dropped before doing the
+        # more expensive intersection. Preparing the polygon speeds up the
+        # repeated intersects tests.
+        with _prepared(self.polygon):
+            full_grid = full_grid[shapely.intersects(self.polygon, full_grid)]
+            clipped_grid = shapely.intersection(full_grid, self.polygon)
+        clipped_grid = clipped_grid[~shapely.is_empty(clipped_grid)]
+        
+        clipped_types = shapely.get_type_id(clipped_grid)
+        is_polygonal = np.isin(clipped_types, [shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON])
+        if not is_polygonal.all():
+            geom_type = clipped_grid[~is_polygonal][0].geom_type
+            raise RuntimeError(f'cant handle geom_type {geom_type}')
+        
+        # MultiPolygons are split into their individual parts, keeping
+        # the original grid order. grid_shapes is kept as a numpy array 
+        # so it can be indexed and sliced along with the area arrays below.
+        self.grid_shapes = shapely.get_parts(clipped_grid)
     
         adjacency_matrix = self._get_path_adjacency_matrix(self.grid_shapes)
-    
-        path_distances = floyd_warshall(csr_matrix(adjacency_matrix), return_predecessors=False)
         
-        # Of all the pairwise grid elements, choose the pair with the
-        # longest distance between them. Use the 1st of the pair as
-        # a "start" for creating the split polygon.
-        farthest_points = np.where(path_distances == path_distances.max())[0]
-        start_shape_i = farthest_points[0]
+        # Choose the grid element farthest from an arbitrary first element,
+        # then the element farthest from that one. On a grid this gives 
+        # the pair with the longest distance between them without needing 
+        # all pairwise distances. Use the 1st of the pair as a "start" for 
+        # creating the split polygon. 
+        # Elements not connected to the first one are ignored in choosing
+        # the start, and end up last in the ordering.
+        seed_distances = dijkstra(adjacency_matrix, indices=0, return_predecessors=False)
+        seed_distances[np.isinf(seed_distances)] = -1
+        start_shape_i = int(seed_distances.argmax())
+        
+        distance_from_start = dijkstra(adjacency_matrix, indices=start_shape_i, return_predecessors=False)
+        self.element_spatial_order = np.argsort(distance_from_start, kind='stable').tolist()
         
-        distance_from_start = path_distances[start_shape_i]
-        self.element_spatial_order = list(range(len(self.grid_shapes)))
-        self.element_spatial_order.sort(key = lambda i: distance_from_start[i])
+        self.grid_shapes = self.grid_shapes[self.element_spatial_order]
         
-        self.grid_shapes = [self.grid_shapes[i] for i in self.element_spatial_order]
+        # The grid elements do not overlap, so the area of any run of them
+        # is the difference of two cumulative sums. This lets candidate
+        # splits be scored without building the sub polygons.
+        self._areas = shapely.area(self.grid_shapes)
+        self._area_cumsum = np.concatenate([[0], np.cumsum(self._areas)])
     
     def _make_shapes(self, splits_idx):
         needed_split_points = self.n_splits
@@ -111,29 +129,67 @@ class BlockSplitter:
         shapes = []
         begin_idx = 0
         for idx in splits_idx:
-            shapes.append(unary_union(self.grid_shapes[begin_idx:idx]))
+            shapes.append(shapely.union_all(self.grid_shapes[begin_idx:idx]))
             begin_idx = idx 
         
         # The final sub polygon will always be from the last split_idx
         # until the end.
-        shapes.append(unary_union(self.grid_shapes[begin_idx:]))
+        shapes.append(shapely.union_all(self.grid_shapes[begin_idx:]))
         
         return shapes
     
     def _calculate_area_weights(self, shapes):
-        total_area = unary_union(shapes).area
-        return np.array([s.area/total_area for s in shapes])
+        shapes = np.asarray(shapes, dtype=object)
+        total_area = shapely.area(shapely.union_all(shapes))
+        return shapely.area(shapes) / total_area
+    
+    def _candidate_area_weights(self, splits_idx):
+        # Equivalent to _calculate_area_weights(_make_shapes(splits_idx)). 
+        # Out of order splits produce an empty sub polygon, so negative 
+        # areas are set to 0 the same as an empty slice of grid_shapes.
+        # splits_idx can also be 2d, with one set of splits per row.
+        splits_idx = np.asarray(splits_idx, dtype=int)
+        n_grid_shapes = len(self.grid_shapes)
+        leading_shape = splits_idx.shape[:-1] + (1,)
+        boundaries = np.concatenate([
+            np.zeros(leading_shape, dtype=int),
+            splits_idx,
+            np.full(leading_shape, n_grid_shapes),
+            ], axis=-1)
+        areas = np.maximum(np.diff(self._area_cumsum[boundaries], axis=-1), 0)
+        return areas / self._area_cumsum[-1]
+    
+    def _initial_splits(self):
+        # The split where the cumulative area of the ordered grid elements
+        # is closest to the cumulative area of the weights. 
+        target_areas = np.cumsum(self.subpolygon_weights[:-1]) * self._area_cumsum[-1]
+        splits_idx = np.searchsorted(self._area_cumsum, target_areas)
+        splits_idx = np.clip(splits_idx, 1, len(self.grid_shapes))
+        
+        # searchsorted gives the 1st index at or above the target, the one 
+        # before it may be closer.
+        above_error = self._area_cumsum[splits_idx] - target_areas
+        below_error = target_areas - self._area_cumsum[splits_idx - 1]
+        splits_idx[below_error < above_error] -= 1
+        return splits_idx
     
     def optimize_polygon_split(self):
         
         def func_to_minimize(x):
-            x = [int(i) for i in x]
-            candidate_shapes = self._make_shapes(splits_idx=x)
-            candidate_weights = self._calculate_area_weights(candidate_shapes)
-            return np.absolute(self.subpolygon_weights-candidate_weights).mean()
+            # With vectorized=True x has shape (n_splits, population_size),
+            # so transpose to get a set of candidate splits on each row.
+            x = np.asarray(x).T.astype(int)
+            candidate_weights = self._candidate_area_weights(splits_idx=x)
+            return np.absolute(self.subpolygon_weights-candidate_weights).mean(axis=-1)
 
+        # Using the weights to make some decent starting points. 
         n_grid_shapes = len(self.grid_shapes)
-        bounds = [(0, n_grid_shapes) for i in range(self.n_splits)]
+        initial_splits = self._initial_splits()
+        
+        # The best splits should be close to the initial ones, so only 
+        # search a band around those. 
+        search_band = max(1, ceil(self.block_size * n_grid_shapes))
+        bounds = [(max(0, i - search_band), min(n_grid_shapes, i + search_band)) for i in initial_splits]
         
         # Linear constraint to specify that the optimizion solution
         # (the 1d array x) should be monotonically increasing such 
@@ -158,15 +214,18 @@ class BlockSplitter:
         else:
             constraints = () # no constraints
         
-        # Using the weights to make some decent starting points
-        n_grid_shapes = len(self.grid_shapes)
-        initial_splits = (np.cumsum(self.subpolygon_weights[:-1]) * n_grid_shapes).astype(int)
-        
         optimize_out = optimize.differential_evolution(
             func = func_to_minimize, 
             bounds = bounds,
             constraints = constraints,
-            x0 = initial_splits
+            x0 = initial_splits,
+            integrality = np.ones(self.n_splits, dtype=bool),
+            vectorized = True,
+            updating = 'deferred',
+            init = 'sobol',
+            tol = 1e-3,
+            # The splits are integers so a gradient based polish does nothing.
+            polish = False,
             )
         
         self.optimized_splits = [int(i) for i in optimize_out['x']]
@@ -177,34 +236,43 @@ class BlockSplitter:
             np.arange(miny, maxy, side_length),
             np.arange(minx, maxx, side_length)
             )
+        all_x = all_x.flatten()
+        all_y = all_y.flatten()
         
-        polygons = []
-        for x, y in zip(all_x.flatten(), all_y.flatten()):
-            polygons.append(
-                box(x, y, x+side_length, y+side_length)
-                )
-        return polygons
+        return shapely.box(all_x, all_y, all_x+side_length, all_y+side_length)
         
     def _get_path_adjacency_matrix(self, elements):
         n_elements = len(elements)
         
         # First use an adjancy matrix to find the longest path while 
         # staying within the shape. This results in a start and end point.
-        adjacency_matrix = np.zeros(shape=(n_elements,n_elements), dtype=np.float32)
-        for element1_i, element1 in enumerate(elements):
-            for element2_i, element2 in enumerate(elements):
-                # Only adjacent if they share a border, not just a corner point
-                if element1==element2:
-                    pass
-                    continue
-                intersection = element1.intersection(element2)
-                if intersection.is_empty:
-                    continue 
-                elif intersection.geom_type=='Point':
-                    adjacency_matrix[element1_i, element2_i] = 1.5
-                elif intersection.geom_type=='LineString':
-                    adjacency_matrix[element1_i, element2_i] = 1
-        return adjacency_matrix
+        # Only pairs whose bounds overlap can possibly touch, so use a 
+        # spatial index to get candidate pairs rather than testing all of them.
+        tree = shapely.STRtree(elements)
+        left, right = tree.query(elements, predicate='intersects')
+        
+        # Each pair is returned in both directions, so keep just the upper
+        # triangle (this also drops each element paired with itself)
+        upper = left < right
+        left, right = left[upper], right[upper]
+        
+        intersections = shapely.intersection(elements[left], elements[right])
+        type_ids = shapely.get_type_id(intersections)
+        
+        # Only adjacent if they share a border, not just a corner point
+        is_point = type_ids == shapely.GeometryType.POINT
+        is_line  = type_ids == shapely.GeometryType.LINESTRING
+        is_adjacent = is_point | is_line
+        left, right = left[is_adjacent], right[is_adjacent]
+        weights = np.where(is_point[is_adjacent], 1.5, 1).astype(np.float32)
+        
+        # Each element only has a handful of neighbors, so build the
+        # symmetric matrix directly in sparse form.
+        return csr_matrix(
+            (np.concatenate([weights, weights]),
+             (np.concatenate([left, right]), np.concatenate([right, left]))),
+            shape=(n_elements,n_elements),
+            )
     
     
     
@@ -1,9 +1,10 @@
 import numpy as np
+import shapely
 
 from shapely_extra import shapes
-from shapely.geometry import box, Point, Polygon, MultiPolygon
+from shapely_extra.utils import _prepared
+from shapely.geometry import Point, Polygon, MultiPolygon
 from shapely.affinity import translate
-from shapely.ops import snap
 
 from math import ceil, sqrt, pi
 
@@ -26,20 +27,34 @@ def point_grid(polygon: Union[Polygon, MultiPolygon],
     [Point]
 
     """
-    minx, miny, maxx, maxy = polygon.bounds
+    with _prepared(polygon):
+        all_x, all_y = _point_grid_xy(polygon, distance=distance)
     
+    return shapely.points(all_x, all_y).tolist()
+
+def _point_grid_xy(polygon: Union[Polygon, MultiPolygon], 
+                   distance:float = 1) -> tuple[np.ndarray, np.ndarray]:
+    """ 
+    The x and y coordinates of point_grid(polygon, distance) as two 1d arrays.
+    """
+    all_x, all_y = _lattice_xy(*polygon.bounds, distance=distance)
+    
+    is_inside = shapely.contains_xy(polygon, all_x, all_y)
+    
+    return all_x[is_inside], all_y[is_inside]
+
+def _lattice_xy(minx:float, miny:float, maxx:float, maxy:float, 
+                distance:float = 1) -> tuple[np.ndarray, np.ndarray]:
+    """ 
+    The x and y coordinates of a regular grid of points covering the 
+    bounds, as two 1d arrays.
+    """
     all_y, all_x = np.meshgrid(
             np.arange(miny, maxy, distance),
             np.arange(minx, maxx, distance)
             )
     
-    points = []
-    for x, y in zip(all_x.flatten(), all_y.flatten()):
-        points.append(
-            Point(x, y)
-            )
-    
-    return [p for p in points if p.within(polygon)]
+    return all_x.flatten(), all_y.flatten()
 
 def square_grid(polygon: Union[Polygon, MultiPolygon], 
                 square_sidelength:float = 1, 
@@ -69,14 +84,15 @@ def square_grid(polygon: Union[Polygon, MultiPolygon],
         square_sidelength = sqrt(square_area)
     
     # Buffer by the internal spacing to ensure the grid is generated all along the boundary.
-    centers = point_grid(polygon = box(*polygon.buffer(square_sidelength).bounds), distance=square_sidelength)
+    centers_x, centers_y = _lattice_xy(*polygon.buffer(square_sidelength).bounds, distance=square_sidelength)
     
-    squares = [shapes.square(center=(c.x,c.y), sidelength=square_sidelength) for c in centers]
-    squares = [s for s in squares if s.intersects(polygon)]
-    if clip:
-        squares = [s.intersection(polygon) for s in squares]
+    squares = shapes._squares(centers_x, centers_y, sidelength=square_sidelength)
+    with _prepared(polygon):
+        squares = squares[_intersects(squares, polygon)]
+        if clip:
+            squares = _clip(squares, polygon)
     
-    return squares
+    return squares.tolist()
 
 # A circle grid looks neat, but is there a use case since it can't fill up
 # a polygon completly?
@@ -174,64 +190,65 @@ def hexagon_grid(polygon: Union[Polygon, MultiPolygon],
     n_cols = ceil((maxx-minx)/x_spacing)
     n_rows = ceil((maxy-miny)/y_spacing)
     
-    hexagons = []
-    hexagon_ids = [] # for debugging
-    for row_i in range(n_rows):
-        hexagons.append([None]*n_cols)       
-        hexagon_ids.append([None]*n_cols)
-        for col_i in range(n_cols):
-            if _is_odd(col_i):
-                col_x_offset = x_spacing * col_i
-                col_y_offset = (y_spacing*0.5)  + (row_i * y_spacing)
-            else:
-                col_x_offset = x_spacing * col_i
-                col_y_offset = y_spacing  * row_i
-            
-        
-            hexagon_ids[row_i][col_i] = f'({row_i},{col_i})'
-            
-            hexagons[row_i][col_i] = shapes.hexagon(
-                center = (minx + col_x_offset, miny + col_y_offset),
-                sidelength = hexagon_sidelength,
-                )
-            
     #-------------
-    # Rounding errors means hexagon edges are not exactly aligned by some very
-    # small numbers. So iterate though each hexagon's neighbors and snap
-    # them together.
-    # Using the offset grid neighboor method from 
-    # https://www.redblobgames.com/grids/hexagons/#neighbors-offset
-    evenq_direction_differences = [
-        # even cols 
-        [[+1, +1], [+1,  0], [ 0, -1], 
-         [-1,  0], [-1, +1], [ 0, +1]],
-        # odd cols 
-        [[+1,  0], [+1, -1], [ 0, -1], 
-         [-1, -1], [-1,  0], [ 0, +1]],
-    ]
-    
-    snapping_tolerance = hexagon_sidelength*0.01
-    for row_i in range(n_rows):
-        for col_i in range(n_cols):
-            target_hex_shape = hexagons[row_i][col_i]
-            for neighbor in range(6):
-                parity = col_i & 1
-                diffs = evenq_direction_differences[parity][neighbor]
-                try:
-                    neighbor_hex_shape = hexagons[row_i + diffs[0]][col_i + diffs[1]]
-                    hexagons[row_i + diffs[0]][col_i + diffs[1]] = snap(neighbor_hex_shape, target_hex_shape, snapping_tolerance)
-                except IndexError:
-                    # beyond the grid
-                    pass
-    
-    #--------------
-    # Flatten the grid
-    hexagons = [i for row in hexagons for i in row]
+    # Neighboring hexagons need to share exactly the same vertices, otherwise
+    # rounding errors leave tiny gaps and overlaps between them. So all
+    # vertices are placed on a lattice with a spacing of half the sidelength 
+    # on the x axis and half the row height on the y axis. A vertex shared 
+    # by 2 hexagons has the same integer lattice position in both, and so 
+    # the exact same coordinates.
+    # Hexagon centers are 3 lattice units apart on the x axis, and 2 on the y
+    # axis, with odd columns shifted up by half a row.
+    row_i, col_i = np.meshgrid(np.arange(n_rows), np.arange(n_cols), indexing='ij')
+    center_lattice_x = (3 * col_i).flatten()
+    center_lattice_y = (2 * row_i + _is_odd(col_i)).flatten()
+    
+    # The 6 vertices, counter-clockwise from the one at angle 0.
+    vertex_lattice_x = np.array([2, 1, -1, -2, -1,  1])
+    vertex_lattice_y = np.array([0, 1,  1,  0, -1, -1])
+    
+    hex_points = np.stack([
+        minx + (hexagon_sidelength/2) * (center_lattice_x[:, np.newaxis] + vertex_lattice_x),
+        miny + (y_spacing/2) * (center_lattice_y[:, np.newaxis] + vertex_lattice_y),
+        ], axis=-1)
+    hexagons = shapely.polygons(hex_points)
     
     # Subset to shapes which are at least partly within polygon.
-    hexagons = [i for i in hexagons if i.intersects(polygon)]
+    with _prepared(polygon):
+        hexagons = hexagons[_intersects(hexagons, polygon)]
+        if clip:
+            hexagons = _clip(hexagons, polygon)
+    
+    return hexagons[~shapely.is_empty(hexagons)].tolist()
 
-    if clip:
-        hexagons = [s.intersection(polygon) for s in hexagons]
+def _intersects(geoms: np.ndarray, 
+                polygon: Union[Polygon, MultiPolygon]) -> np.ndarray:
+    """ 
+    Boolean array of which geoms intersect polygon.
     
-    return [h for h in hexagons if not h.is_empty]
+    For a MultiPolygon a spatial index of its parts is used, so each geom is
+    only tested against the parts it could possibly touch.
+    """
+    if polygon.geom_type == 'MultiPolygon':
+        tree = shapely.STRtree(polygon.geoms)
+        geom_idx, _ = tree.query(geoms, predicate='intersects')
+        is_intersecting = np.zeros(len(geoms), dtype=bool)
+        is_intersecting[geom_idx] = True
+        return is_intersecting
+    
+    # polygon first so a prepared polygon is used.
+    return shapely.intersects(polygon, geoms)
+
+def _clip(geoms: np.ndarray, 
+          polygon: Union[Polygon, MultiPolygon]) -> np.ndarray:
+    """ 
+    geoms clipped to the polygon boundary. 
+    
+    Only geoms crossing the boundary are intersected, those entirely within 
+    polygon are returned as is. The containment test is much cheaper than 
+    the intersection when polygon is prepared.
+    """
+    geoms = geoms.copy()
+    is_crossing = ~shapely.contains(polygon, geoms)
+    geoms[is_crossing] = shapely.intersection(geoms[is_crossing], polygon)
+    return geoms
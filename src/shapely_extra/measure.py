@@ -1,10 +1,13 @@
 import numpy as np
-from shapely.geometry import Point, LineString, MultiLineString, Polygon, MultiPolygon
+import shapely
+from shapely.geometry import LineString, MultiLineString, Polygon, MultiPolygon
 
 from scipy import spatial
 
-from shapely_extra.random import sample_points_on_line
-from shapely_extra.angles import perpendicular_line_at_endpoint
+from math import isclose
+
+from shapely_extra.random import _sample_distances_on_line
+from shapely_extra.angles import perpendicular_lines
 
 from typing import Union
         
@@ -17,6 +20,10 @@ def major_axis(polygon: Union[Polygon, MultiPolygon],
     This is calculated by densifying the boundary of the  polygon 
     with numerous points, measuring the pairwise euclidean distance 
     between them all, and choosing the longest. 
+    
+    For a convex polygon with at most n_sample_points vertices the 
+    longest distance will always be between 2 vertices, so those are 
+    used instead and the major axis is exact.
 
     Parameters
     ----------
@@ -43,46 +50,77 @@ def major_axis(polygon: Union[Polygon, MultiPolygon],
         total_length = sum(subpolygon_line_lengths)
         points_per_subpolygon = [max(int(length/total_length*n_sample_points),1) for length in subpolygon_line_lengths]
         
-        exterior_point_arr = []
-        for line, n_points in zip(subpolygons_as_lines, points_per_subpolygon):
-            points = sample_points_on_line(line, n=n_points, ordered=True, seed=seed)
-            exterior_point_arr.extend([(p.x,p.y) for p in points])
+        exterior_point_arr = np.concatenate([
+            _sample_coords_on_line(line, n=n_points, seed=seed) 
+            for line, n_points in zip(subpolygons_as_lines, points_per_subpolygon)
+            ])
             
+    elif polygon.geom_type=='Polygon' and _is_small_convex_polygon(polygon, max_vertices=n_sample_points):
+        exterior_point_arr = shapely.get_coordinates(polygon.exterior)[:-1]
+    
     elif polygon.geom_type=='Polygon':
-        points = sample_points_on_line(LineString(polygon.exterior.coords), n=n_sample_points, ordered=True, seed=seed)
-        exterior_point_arr = [(p.x,p.y) for p in points]
+        exterior_point_arr = _sample_coords_on_line(LineString(polygon.exterior.coords), n=n_sample_points, seed=seed)
     
     else:
         raise TypeError('polygon must be either MultiPolygon or Polygon')
     
-    
+    # The condensed pairwise distance matrix is enough to find the longest
+    # distance, so there is no need to convert it to a full square matrix.
     distances = spatial.distance.pdist(exterior_point_arr)
-    # Convert from condensed pairwise distance matrix to traditional one.
-    distances =  spatial.distance.squareform(distances)
-    
-    # np.where gives us the indices of the longest distances
-    # separated by axis. Here it is axis 0 and 1 for the
-    # 2d distance matrix.
-    max_0, max_1 = np.where(distances==distances.max())
-    point1 = exterior_point_arr[max_0[0]]
-    point2 = exterior_point_arr[max_1[0]]
+    max_0, max_1 = _condensed_index_to_pair(int(distances.argmax()), len(exterior_point_arr))
+    point1 = exterior_point_arr[max_0]
+    point2 = exterior_point_arr[max_1]
     
     return LineString([point1, point2])
 
-def _linestring_intersect_and_merge(l: Union[LineString, MultiLineString], 
-                                    polygon: Union[Polygon, MultiPolygon]) -> LineString:
+def _is_small_convex_polygon(polygon: Polygon, max_vertices: int) -> bool:
     """ 
-    Intersect a line with a polygon and, if needed, stitch the
-    a MultiLineString back together into a single LineString
+    Whether polygon is convex, without holes, and has at most max_vertices
+    """
+    if len(polygon.interiors) > 0 or len(polygon.exterior.coords) - 1 > max_vertices:
+        return False
+    return isclose(polygon.convex_hull.area, polygon.area, rel_tol=1e-9)
+
+def _sample_coords_on_line(line: LineString, 
+                           n: int, 
+                           seed: float) -> np.ndarray:
+    """ 
+    The same points as sample_points_on_line(line, n, ordered=True, seed=seed), 
+    but as an (n,2) array of x,y coordinates.
+    """
+    distances = _sample_distances_on_line(line, n=n, ordered=True, seed=seed)
+    return shapely.get_coordinates(shapely.line_interpolate_point(line, distances))
+
+def _condensed_index_to_pair(k: int, n: int) -> tuple[int, int]:
+    """ 
+    Convert an index of a condensed distance matrix, as returned by 
+    scipy.spatial.distance.pdist, of n observations into the (i,j) index 
+    of the equivalent square matrix, where i < j.
+    """
+    i = int(np.floor((2*n - 1 - np.sqrt((2*n - 1)**2 - 8*k)) / 2))
+    # Correct for any floating point error in the sqrt
+    row_start = lambda i: i*(2*n - i - 1)//2
+    while i > 0 and row_start(i) > k:
+        i -= 1
+    while row_start(i+1) <= k:
+        i += 1
+    j = k - row_start(i) + i + 1
+    return i, j
+
+def _merge_lines(out: Union[LineString, MultiLineString]) -> LineString:
+    """ 
+    Stitch a MultiLineString, from intersecting a line with a polygon, back 
+    together into a single LineString
     """
-    assert l.geom_type=='LineString'
-    out = l.intersection(polygon)
     if out.geom_type =='LineString':
         return out
     elif out.geom_type =='MultiLineString':
-        first_point = out.geoms[0].coords[0]
-        last_point  = out.geoms[-1].coords[-1]
-        return LineString([first_point, last_point])
+        merged = shapely.line_merge(out)
+        if merged.geom_type == 'LineString':
+            return merged
+        # Pieces which are not connected can't be merged, so use the
+        # longest one.
+        return max(merged.geoms, key=lambda g: g.length)
     else:
         return out
     
@@ -126,24 +164,30 @@ def minor_axis(polygon: Union[Polygon, MultiPolygon],
     else:
         major_axis_line = major_axis(polygon, n_sample_points=n_sample_points, seed=seed)
     
-    candidate_line_points = sample_points_on_line(major_axis_line, n=n_sample_points, ordered=True, seed=seed)
+    candidate_line_points = _sample_coords_on_line(major_axis_line, n=n_sample_points, seed=seed)
     candinate_line_start_length = max(
         polygon.bounds[2] - polygon.bounds[0],
         polygon.bounds[3] - polygon.bounds[1]
         )
-    major_axis_startpoint = Point(major_axis_line.coords[0])
-    candidate_lines = []
-
-    for p in candidate_line_points:
-        candidate_lines.append(perpendicular_line_at_endpoint(
-            ref_line = LineString([major_axis_startpoint, p]), 
-            length = candinate_line_start_length, 
-            location='end', 
-            attached = 'center'
-            ))
-        
-        candidate_lines[-1] = _linestring_intersect_and_merge(candidate_lines[-1],polygon)
+    major_axis_startpoint = np.asarray(major_axis_line.coords[0])
+    
+    # Each candidate line is perpendicular to the line from the major axis 
+    # start to the candidate point, and centered on the candidate point.
+    ref_lines = shapely.linestrings(np.stack([
+        np.broadcast_to(major_axis_startpoint, candidate_line_points.shape), 
+        candidate_line_points,
+        ], axis=1))
+    candidate_lines = perpendicular_lines(
+        ref_lines, 
+        lengths = candinate_line_start_length, 
+        location = 'end', 
+        attached = 'center',
+        )
+    
+    candidate_lines = shapely.intersection(candidate_lines, polygon)
+    is_multi = shapely.get_type_id(candidate_lines) == shapely.GeometryType.MULTILINESTRING
+    candidate_lines[is_multi] = [_merge_lines(l) for l in candidate_lines[is_multi]]
         
-    candidate_line_lengths = [l.length for l in candidate_lines]
+    candidate_line_lengths = shapely.length(candidate_lines)
     
-    return candidate_lines[np.argmax(candidate_line_lengths)]
\ No newline at end of file
+    return candidate_lines[np.argmax(candidate_line_lengths)]
@@ -1,9 +1,11 @@
 import numpy as np
-from shapely.geometry import Point, Polygon, MultiPolygon, MultiPoint, LineString
+import shapely
+from shapely.geometry import Point, Polygon, MultiPolygon, LineString
 from shapely.ops import unary_union, voronoi_diagram
 from shapely import line_interpolate_point
 
 from shapely_extra import shapes
+from shapely_extra.utils import _prepared
 
 from typing import Union
 
@@ -22,8 +24,9 @@ def sample_points_in_polygon(polygon: Union[Polygon, MultiPolygon],
         Number of points to calculate. 
     seed : numeric
         Random seed.
-    attempts : int
-        To keep the recursive function under control.
+    attempt : int
+        The number of rounds of sampling already done. Sampling stops with
+        an error after 50.
 
     Returns
     -------
@@ -31,27 +34,94 @@ def sample_points_in_polygon(polygon: Union[Polygon, MultiPolygon],
         List of Points.
 
     """
-    if attempt > 50:
-        raise RuntimeError(f'attempts exceeded, cannot sample polygon')
+    x, y = _sample_coords_in_polygon(polygon, n=n, seed=seed, attempt=attempt)
+    
+    return shapely.points(x, y).tolist()
+
+def _sample_coords_in_polygon(polygon: Union[Polygon, MultiPolygon], 
+                              n:int, 
+                              seed: Union[float,None] = None, 
+                              attempt:int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """ 
+    The x and y coordinates of sample_points_in_polygon(polygon, n, seed, attempt) 
+    as two 1d arrays.
+    """
     assert polygon.geom_type in ['Polygon','MultiPolygon']
 
     rng = np.random.default_rng(seed)
     
     minx, miny, maxx, maxy = polygon.bounds
     
-    x_coords = rng.uniform(low = minx, high=maxx, size=n*2)
-    y_coords = rng.uniform(low = miny, high=maxy, size=n*2)
-    point_geoms = [Point(x,y) for x,y in zip(x_coords, y_coords)]
+    if polygon.area <= 0:
+        raise RuntimeError('cannot sample polygon with no area')
+    
+    # Random points within the bounds will land inside the polygon at a rate
+    # of polygon.area / bbox_area. When that is low, for example a long
+    # thin diagonal shape, sample from the convex hull instead.
+    bbox_area = (maxx - minx) * (maxy - miny)
+    if polygon.area / bbox_area < 0.5:
+        sample_area = polygon.convex_hull.area
+        hull_triangles = _triangulate_convex_hull(polygon)
+        sample_candidates = lambda size: _sample_coords_in_triangles(hull_triangles, size=size, rng=rng)
+    else:
+        sample_area = bbox_area
+        sample_candidates = lambda size: (
+            rng.uniform(low = minx, high=maxx, size=size),
+            rng.uniform(low = miny, high=maxy, size=size),
+            )
     
-    point_geoms = [p for p in point_geoms if p.within(polygon)]
+    # Draw enough that one round is usually sufficient.
+    n_candidates = max(n, int(n * sample_area / polygon.area * 1.5))
+    
+    # Start with empty arrays so n=0 gives no points instead of nothing to concatenate.
+    x_inside, y_inside = [np.empty(0)], [np.empty(0)]
+    n_inside = 0
+    with _prepared(polygon):
+        while n_inside < n:
+            if attempt > 50:
+                raise RuntimeError(f'attempts exceeded, cannot sample polygon')
+            
+            x_coords, y_coords = sample_candidates(n_candidates)
+            is_inside = shapely.contains_xy(polygon, x_coords, y_coords)
+            
+            x_inside.append(x_coords[is_inside])
+            y_inside.append(y_coords[is_inside])
+            n_inside += is_inside.sum()
+            attempt += 1
+    
+    x_inside = np.concatenate(x_inside)[:n]
+    y_inside = np.concatenate(y_inside)[:n]
+    
+    return x_inside, y_inside
+
+
+def _triangulate_convex_hull(polygon: Union[Polygon, MultiPolygon]) -> np.ndarray:
+    """ 
+    Triangles covering the convex hull of polygon, as an array of shape
+    (n_triangles, 3, 2) of x,y vertex coordinates.
+    """
+    triangles = shapely.get_parts(shapely.delaunay_triangles(polygon.convex_hull))
+    # Each triangle ring has the first vertex repeated at the end.
+    return shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3, :]
+
+def _sample_coords_in_triangles(triangles: np.ndarray, 
+                                size: int, 
+                                rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """ 
+    Uniformly distributed random x,y coordinates within a set of non
+    overlapping triangles, as made by _triangulate_convex_hull.
+    """
+    a, b, c = triangles[:, 0, :], triangles[:, 1, :], triangles[:, 2, :]
+    ab, ac = b - a, c - a
+    areas = 0.5 * np.abs(ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0])
     
-    while len(point_geoms) < n:
-        point_geoms.extend(
-            sample_points_in_polygon(polygon, n, seed, attempt+1)
-            )
-
-    return point_geoms[:n]
-
+    # First choose a triangle, weighted by area, then a location within it.
+    triangle_i = rng.choice(len(triangles), size=size, p=areas/areas.sum())
+    sqrt_u = np.sqrt(rng.uniform(size=size))[:, np.newaxis]
+    v = rng.uniform(size=size)[:, np.newaxis]
+    coords = (1 - sqrt_u) * a[triangle_i] + sqrt_u * (1 - v) * b[triangle_i] + sqrt_u * v * c[triangle_i]
+    
+    return coords[:, 0], coords[:, 1]
 
 def sample_points_on_line(linestring:LineString, 
                           n:int, 
@@ -80,11 +150,22 @@ def sample_points_on_line(linestring:LineString,
     """
     assert linestring.geom_type in ['LineString']
     
+    point_lengths_from_origin = _sample_distances_on_line(linestring, n=n, ordered=ordered, seed=seed)
+    return line_interpolate_point(linestring, distance=point_lengths_from_origin).tolist()
+
+def _sample_distances_on_line(linestring:LineString, 
+                              n:int, 
+                              ordered:bool = False, 
+                              seed: Union[float,None] = None) -> np.ndarray:
+    """ 
+    The random distances from the linestring origin used by 
+    sample_points_on_line.
+    """
     rng = np.random.default_rng(seed)
     point_lengths_from_origin = rng.uniform(low = 0, high=linestring.length, size=n)
     if ordered:
         point_lengths_from_origin.sort()
-    return [line_interpolate_point(linestring, distance=d) for d in point_lengths_from_origin]
+    return point_lengths_from_origin
 
 def sample_polygons(polygon: Union[Polygon, MultiPolygon], 
                     n:int, 
@@ -120,20 +201,27 @@ def sample_polygons(polygon: Union[Polygon, MultiPolygon],
     [Polygon].
         A list of polygons which fill the original polygon.
     """
-    random_points = sample_points_in_polygon(
-        polygon = polygon,
-        n=n,
-        seed=seed,
-        )
-    
-    if method == 'voronoi':
-        point_geom = MultiPoint(random_points)
-        polygon_geoms = [g.intersection(polygon) for g in voronoi_diagram(point_geom).geoms]
+    # The polygon is prepared once for both the sampling and the clipping.
+    with _prepared(polygon):
+        # Only the coordinates are needed, not individual Points.
+        random_x, random_y = _sample_coords_in_polygon(
+            polygon = polygon,
+            n=n,
+            seed=seed,
+            )
         
-        return polygon_geoms
-
-    else:
-        raise ValueError('No other methods configured besides voronoi')
+        if method == 'voronoi':
+            point_geom = shapely.multipoints(np.column_stack([random_x, random_y]))
+            polygon_geoms = shapely.get_parts(voronoi_diagram(point_geom))
+            
+            # Only cells crossing the polygon boundary need to be clipped.
+            is_inside = shapely.contains(polygon, polygon_geoms)
+            polygon_geoms[~is_inside] = shapely.intersection(polygon_geoms[~is_inside], polygon)
+            
+            return polygon_geoms.tolist()
+
+        else:
+            raise ValueError('No other methods configured besides voronoi')
     
     
     
@@ -1,13 +1,19 @@
 import numpy as np
+import shapely
 from shapely.geometry import Point, Polygon
 
 from math import (
-    radians, degrees, sin, cos, sqrt, pi, isclose)
+    radians, degrees, sin, cos, sqrt, pi, isclose, ceil)
 
 import numbers
+from functools import lru_cache
 
 from typing import Union
 
+# Unit vectors from a hexagon center to each of its 6 vertices.
+_HEX_COS = tuple(cos(pi / 180 * (60 * i)) for i in range(6))
+_HEX_SIN = tuple(sin(pi / 180 * (60 * i)) for i in range(6))
+
 def hexagon(center: tuple[float,float] = (0,0), 
             sidelength:float = 1, 
             area: Union[float, None] = None) -> Polygon:
@@ -38,16 +44,8 @@ def hexagon(center: tuple[float,float] = (0,0),
         h = sidelength
 
     center_x, center_y = center
-
-    hex_points = []
-    for i in range(6):
-        angle_deg = 60 * i
-        angle_rad = pi / 180 * angle_deg
-        hex_points.append(
-            Point(center_x + h * cos(angle_rad),
-                  center_y + h * sin(angle_rad)))
-        
-    return Polygon(hex_points)
+    
+    return Polygon([(center_x + h * c, center_y + h * s) for c, s in zip(_HEX_COS, _HEX_SIN)])
 
 # def triangle(center = (0,0), angles = (60,60,60), area=1, lengths=None):
 #     """
@@ -98,13 +96,29 @@ def square(center: tuple[float,float] = (0,0),
     if area is not None:
         sidelength = sqrt(area)
     
+    center_x, center_y = center
+    
+    return _squares([center_x], [center_y], sidelength=sidelength)[0]
+
+def _squares(centers_x: np.ndarray, 
+             centers_y: np.ndarray, 
+             sidelength: float) -> np.ndarray:
+    """ 
+    Create an array of squares, one for each center, all with the same 
+    sidelength. 
+    """
     half_length = sidelength/2
-    ll = Point(center[0] - half_length, center[1] - half_length)
-    lr = Point(center[0] + half_length, center[1] - half_length)
-    ur = Point(center[0] + half_length, center[1] + half_length)
-    ul = Point(center[0] - half_length, center[1] + half_length)
+    offsets = np.array([
+        [-half_length, -half_length], # lower left
+        [+half_length, -half_length], # lower right
+        [+half_length, +half_length], # upper right
+        [-half_length, +half_length], # upper left
+        ])
     
-    return Polygon([ll, lr, ur, ul])
+    centers = np.column_stack([centers_x, centers_y])
+    square_points = centers[:, np.newaxis, :] + offsets[np.newaxis, :, :]
+    
+    return shapely.polygons(square_points)
 
 def circle(center: tuple[float,float] = (0,0), 
            radius:float = 1, 
@@ -197,20 +211,108 @@ def circle(center: tuple[float,float] = (0,0),
             raise ValueError('rel_tolerance should be > 0.')
         tol = rel_tolerance * true_area
     
-    #TODO: a better gradient function could speed this up.
-    # potential approximate solution: https://math.stackexchange.com/questions/4132060/compute-number-of-regular-polgy-sides-to-approximate-circle-to-defined-precision
-    for n_segs_per_qtr_circle in range(1,10000):
-        n_segs_per_circle = n_segs_per_qtr_circle * 4
-        # A circle polygon is a ring of evenly distributed points, where the
-        # line between each point makes a segment. A shapely
-        # buffer distributes the points evenly between the 4 quarters. 
-        # Each segment is a triangle with 2 adjacent sides equal to the radius.
-        # Find the triangle area to find the area made by the circle polygon
-        interior_angle = 360/n_segs_per_circle
-        triangle_area = sin(radians(interior_angle)) * (r**2) * 0.5
-        derived_area = triangle_area * n_segs_per_circle
-
-        if abs(true_area - derived_area) <= tol:
-            break
-    
-    return Point(center).buffer(distance=r, quad_segs=n_segs_per_qtr_circle)
+    n_segs_per_qtr_circle = _required_quad_segs(r, tol)
+    
+    # Scaling the unit circle by r <= 0 would give a degenerate or flipped 
+    # ring, where the buffer gives an empty polygon.
+    if r <= 0:
+        return Point(center).buffer(distance=r, quad_segs=n_segs_per_qtr_circle)
+    
+    center_x, center_y = shapely.get_coordinates(Point(center))[0]
+    
+    return _circles([center_x], [center_y], radius=r, quad_segs=n_segs_per_qtr_circle)[0]
+
+def _circles(centers_x: np.ndarray, 
+             centers_y: np.ndarray, 
+             radius: float, 
+             quad_segs: int) -> np.ndarray:
+    """ 
+    Create an array of circles, one for each center, all with the same 
+    radius. The same as Point(x,y).buffer(radius, quad_segs=quad_segs)
+    for each center. radius must be > 0.
+    """
+    centers = np.column_stack([centers_x, centers_y])
+    circle_points = centers[:, np.newaxis, :] + radius * _unit_circle_coords(quad_segs)[np.newaxis, :, :]
+    
+    return shapely.polygons(circle_points)
+
+@lru_cache(maxsize=128)
+def _unit_circle_coords(quad_segs: int) -> np.ndarray:
+    """ 
+    The ring coordinates of Point(0,0).buffer(1, quad_segs=quad_segs). Scaling 
+    and shifting these is cheaper than buffering a new Point for every circle.
+    """
+    coords = shapely.get_coordinates(Point(0,0).buffer(1, quad_segs=quad_segs))
+    # Cached, so make sure it can't be modified in place.
+    coords.flags.writeable = False
+    return coords
+
+# The most quad_segs circle() will use, regardless of the tolerance.
+MAX_QUAD_SEGS = 9999
+
+def _circle_polygon_area(n_segs_per_qtr_circle:int, r:float) -> float:
+    """ 
+    The area of a circle polygon made with Point.buffer(r, quad_segs=n_segs_per_qtr_circle)
+    """
+    n_segs_per_circle = n_segs_per_qtr_circle * 4
+    # A circle polygon is a ring of evenly distributed points, where the
+    # line between each point makes a segment. A shapely
+    # buffer distributes the points evenly between the 4 quarters. 
+    # Each segment is a triangle with 2 adjacent sides equal to the radius.
+    # Find the triangle area to find the area made by the circle polygon
+    interior_angle = 360/n_segs_per_circle
+    triangle_area = sin(radians(interior_angle)) * (r**2) * 0.5
+    return triangle_area * n_segs_per_circle
+
+def _required_quad_segs(r:float, tol:float, fallback:bool = False) -> int:
+    """ 
+    The smallest quad_segs where the circle polygon area is within tol of
+    the true circle area, up to MAX_QUAD_SEGS.
+    
+    If fallback is True the quad_segs are searched one at a time. This is 
+    slow and only meant for validating the default method.
+    """
+    true_area = pi * r**2
+    within_tol = lambda n: abs(true_area - _circle_polygon_area(n, r)) <= tol
+    
+    if fallback:
+        for n_segs_per_qtr_circle in range(1, MAX_QUAD_SEGS + 1):
+            if within_tol(n_segs_per_qtr_circle):
+                break
+        return n_segs_per_qtr_circle
+    
+    if within_tol(1):
+        return 1
+    if not within_tol(MAX_QUAD_SEGS):
+        return MAX_QUAD_SEGS
+    
+    # The estimate only depends on tol relative to r**2, so rounding that 
+    # lets the estimate be reused across calls.
+    n_segs_per_qtr_circle = _estimate_quad_segs(float(f'{tol / r**2:.6g}'))
+    
+    # Floating point error in the solution, or the rounding, can put it off a bit.
+    while n_segs_per_qtr_circle > 1 and within_tol(n_segs_per_qtr_circle - 1):
+        n_segs_per_qtr_circle -= 1
+    while not within_tol(n_segs_per_qtr_circle):
+        n_segs_per_qtr_circle += 1
+    
+    return n_segs_per_qtr_circle
+
+@lru_cache(maxsize=1024)
+def _estimate_quad_segs(rel_tol:float) -> int:
+    """ 
+    Estimate the quad_segs where the circle polygon area is within 
+    rel_tol * r**2 of the true circle area.
+    """
+    # With quad_segs as a continuous variable q the polygon area 
+    # is 2 * q * r**2 * sin(pi/(2*q)), so relative to r**2 the area
+    # error is pi - 2*q*sin(x), where x = pi/(2*q). 
+    # With the Taylor expansion sin(x)/x ~= 1 - x**2/6 + x**4/120 the error 
+    # is about pi*x**2/6 - pi*x**4/120. Setting that equal to rel_tol gives
+    # a quadratic in x**2.
+    # See https://math.stackexchange.com/questions/4132060/compute-number-of-regular-polgy-sides-to-approximate-circle-to-defined-precision
+    a = min(6 * rel_tol / (5 * pi), 1)
+    x_squared = 10 * a / (1 + sqrt(1 - a))
+    q = pi / (2 * sqrt(x_squared))
+    
+    return min(max(ceil(q), 1), MAX_QUAD_SEGS)
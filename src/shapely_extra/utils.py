@@ -1,9 +1,19 @@
+import numpy as np
+import shapely
 from shapely.geometry import Point, LineString
 
-from shapely_extra.angles import angle_between_points, point_from_angle_and_distance
-
+from math import hypot
+from contextlib import contextmanager
 from typing import Union
 
+# For each side option of extend_line, whether the start and the end are 
+# extended, and the fraction of the length added to each.
+_SIDE_TABLE = {
+    'start' : (True,  False, 1.0),
+    'end'   : (False, True,  1.0),
+    'both'  : (True,  True,  0.5),
+    }
+
 def extend_line(line:LineString, 
                 length: Union[float,None] = None, 
                 length_frac: Union[float,None] = None, 
@@ -42,52 +52,243 @@ def extend_line(line:LineString,
     """
     if not isinstance(line, LineString):
         raise ValueError('line must be LineString')
+    # Only x,y are extended, so refuse Z rather than silently drop it.
+    if line.has_z:
+        raise ValueError('line must be 2D')
     
-    if side not in ['start','end','both']:
+    try:
+        extend_start, extend_end, side_frac = _SIDE_TABLE[side]
+    except (KeyError, TypeError):
         raise ValueError('side must be start, end, or both')
         
     if length_frac is not None:
-        length = line.length * length_frac
+        length = line.length * length_frac * side_frac
+    elif length is None:
+        raise ValueError('length or length_frac must be specified')
     else:
-        if length is None:
-            raise ValueError('length or length_frac must be specified')
-            
+        length = length * side_frac
+    
     if length <= 0:
         raise ValueError('length or length_frac must be  > 0')
     
-    if side == 'both':
-        length = length/2
+    return _extend_line_unchecked(line, length, extend_start, extend_end)
+
+def _extend_line_unchecked(line:LineString, 
+                           length:float, 
+                           extend_start:bool, 
+                           extend_end:bool) -> LineString:
+    """ 
+    extend_line without any of the input validation, for callers which 
+    already know the inputs are valid. length is the length added to each 
+    extended end.
+    """
+    # Only the first 2 and last 2 coordinates are needed to extend the line,
+    # the rest are copied over as is into the new line.
+    line_coords = shapely.get_coordinates(line)
+    (x0, y0), (x1, y1) = line_coords[:2].tolist()
+    (x_second_last, y_second_last), (x_last, y_last) = line_coords[-2:].tolist()
     
-    line_coords = list(line.coords)
+    # The extension continues the direction of the line at each end, so
+    # the new endpoint is the old one plus the unit direction vector
+    # scaled by length. No angles are needed.
+    first_i = int(extend_start)
+    new_coords = np.empty((len(line_coords) + extend_start + extend_end, 2))
+    new_coords[first_i:first_i + len(line_coords)] = line_coords
+    if extend_start:
+        new_coords[0] = _extend_endpoint(x1, y1, x0, y0, length)
+    if extend_end:
+        new_coords[-1] = _extend_endpoint(x_second_last, y_second_last, x_last, y_last, length)
     
-    if side in ['start','both']:
-        old_start = line_coords[0]
-        ref_point = line_coords[1]
-        
-        a = angle_between_points(ref_point, old_start)
-        new_start = point_from_angle_and_distance(
-                ref_point   = old_start,
-                angle       = a,
-                distance    = length,
-                use_radians = True
-            )
-        
-        line_coords.insert(0, new_start)
+    return shapely.linestrings(new_coords)
+
+def _extend_endpoint(x_ref:float, y_ref:float, 
+                     x_end:float, y_end:float, 
+                     length:float) -> tuple[float, float]:
+    """ 
+    The point length past (x_end, y_end), continuing the direction from 
+    (x_ref, y_ref) to (x_end, y_end).
     
-    if side in ['end','both']:
-        old_end   = line_coords[-1]
-        ref_point = line_coords[-2]
-        
-        a = angle_between_points(ref_point, old_end)
-        new_end = point_from_angle_and_distance(
-                ref_point   = old_end,
-                angle       = a,
-                distance    = length,
-                use_radians = True
-            )
+    If the 2 points are the same the direction is along the positive
+    x-axis, the same as atan2(0,0) = 0.
+    """
+    dx = x_end - x_ref
+    dy = y_end - y_ref
+    segment_length = hypot(dx, dy)
+    if segment_length == 0:
+        return x_end + length, y_end
+    scale = length / segment_length
+    return x_end + dx * scale, y_end + dy * scale
+
+def extend_lines(lines: np.ndarray, 
+                 length: Union[float, np.ndarray, None] = None, 
+                 length_frac: Union[float, np.ndarray, None] = None, 
+                 side:str = 'both') -> np.ndarray:
+    """
+    Extend many lines past their endpoints. The same as extend_line, but 
+    for many lines at once.
+
+    Parameters
+    ----------
+    lines : np.ndarray
+        Array of N LineStrings to extend. A single line is treated as an 
+        array of 1.
+    length : numeric or np.ndarray, optional
+        The absolute length to extend. Either a single length for all lines
+        or an array of N lengths. Ignored if length_frac is specified. 
+        The default is None.
+    length_frac : numeric or np.ndarray, optional
+        The fraction to extend by. See extend_line. 
+    side : str, optional
+        Which side of the lines to add length onto. 'start', 'end', or 'both'.
+        If both, the length added will be split evenly between start and end. 
+        The default is 'both'.
+
+    Returns
+    -------
+    np.ndarray
+        Array of N LineStrings.
+
+    """
+    lines = np.atleast_1d(np.asarray(lines, dtype=object))
+    # A LinearRing is a LineString too.
+    is_line = np.isin(shapely.get_type_id(lines), [shapely.GeometryType.LINESTRING, shapely.GeometryType.LINEARRING])
+    if not np.all(is_line):
+        raise ValueError('lines must be LineStrings')
+    if np.any(shapely.has_z(lines)):
+        raise ValueError('lines must be 2D')
+    
+    try:
+        extend_start, extend_end, side_frac = _SIDE_TABLE[side]
+    except (KeyError, TypeError):
+        raise ValueError('side must be start, end, or both')
+    
+    if length_frac is not None:
+        length = shapely.length(lines) * length_frac
+    elif length is None:
+        raise ValueError('length or length_frac must be specified')
+    
+    length = side_frac * np.broadcast_to(np.asarray(length, dtype=np.float64), lines.shape)
+    if np.any(length <= 0):
+        raise ValueError('length or length_frac must be  > 0')
+    
+    n_coords = shapely.get_num_coordinates(lines)
+    if np.any(n_coords < 2):
+        raise ValueError('lines must have at least 2 points')
     
-        line_coords.append(new_end)
+    coords = shapely.get_coordinates(lines)
+    start_i = np.cumsum(n_coords) - n_coords
+    end_i = start_i + n_coords - 1
+    
+    n_added = extend_start + extend_end
+    
+    # Every line gets n_added new coordinates, so the original coordinates
+    # of the k-th line are shifted k*n_added places in the new array.
+    line_shift = np.arange(len(lines)) * n_added
+    new_coords = np.empty((len(coords) + len(lines) * n_added, 2))
+    new_coords[np.arange(len(coords)) + np.repeat(line_shift, n_coords) + extend_start] = coords
+    
+    if extend_start:
+        direction = _unit_vectors(coords[start_i] - coords[start_i + 1])
+        new_coords[start_i + line_shift] = coords[start_i] + direction * length[:, np.newaxis]
+    
+    if extend_end:
+        direction = _unit_vectors(coords[end_i] - coords[end_i - 1])
+        new_coords[end_i + line_shift + extend_start + 1] = coords[end_i] + direction * length[:, np.newaxis]
+    
+    new_indices = np.repeat(np.arange(len(lines)), n_coords + n_added)
+    
+    return shapely.linestrings(new_coords, indices=new_indices)
 
-    return LineString(line_coords)        
-        
-        
\ No newline at end of file
+def _unit_vectors(vectors: np.ndarray) -> np.ndarray:
+    """ 
+    The (N,2) vectors scaled to length 1. Zero length vectors become (1,0), 
+    the same direction as atan2(0,0) = 0.
+    """
+    vector_lengths = np.sqrt(np.square(vectors).sum(axis=1))
+    is_zero_length = vector_lengths == 0
+    vectors = vectors.copy()
+    vectors[is_zero_length] = (1, 0)
+    vector_lengths[is_zero_length] = 1
+    return vectors / vector_lengths[:, np.newaxis]
+
+def extend_lines_xy(x0: np.ndarray, 
+                    y0: np.ndarray, 
+                    x1: np.ndarray, 
+                    y1: np.ndarray, 
+                    length: Union[float, np.ndarray], 
+                    side:str = 'both') -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extend many line segments, given as arrays of their start and end 
+    coordinates, past their endpoints. The same as extend_line for lines 
+    with 2 points, but without constructing any LineStrings. 
+    
+    The results can be made into LineStrings with
+        shapely.linestrings(np.stack([np.column_stack([x0, y0]), np.column_stack([x1, y1])], axis=1))
+
+    Parameters
+    ----------
+    x0, y0 : np.ndarray
+        Arrays of N start coordinates.
+    x1, y1 : np.ndarray
+        Arrays of N end coordinates.
+    length : numeric or np.ndarray
+        The absolute length to extend. Either a single length for all segments
+        or an array of N lengths.
+    side : str, optional
+        Which side of the segments to add length onto. 'start', 'end', or 'both'.
+        If both, the length added will be split evenly between start and end. 
+        The default is 'both'.
+
+    Returns
+    -------
+    tuple
+        The new x0, y0, x1, y1 arrays.
+
+    """
+    try:
+        extend_start, extend_end, side_frac = _SIDE_TABLE[side]
+    except (KeyError, TypeError):
+        raise ValueError('side must be start, end, or both')
+    
+    x0, y0, x1, y1 = [np.asarray(c, dtype=np.float64) for c in (x0, y0, x1, y1)]
+    length = side_frac * np.asarray(length, dtype=np.float64)
+    if np.any(length <= 0):
+        raise ValueError('length must be  > 0')
+    
+    # np.hypot guards against overflow for huge coordinates, but is several 
+    # times slower than the plain sqrt. dx and dy end up as the offsets 
+    # added at each end. A zero length segment is extended along the 
+    # positive x-axis, the same as atan2(0,0) = 0.
+    dx = x1 - x0
+    dy = y1 - y0
+    segment_lengths = np.sqrt(dx*dx + dy*dy)
+    is_zero_length = segment_lengths == 0
+    scale = length / np.where(is_zero_length, 1, segment_lengths)
+    dx = dx * scale
+    dy = dy * scale
+    
+    if extend_start:
+        x0, y0 = x0 - np.where(is_zero_length, -length, dx), y0 - dy
+    if extend_end:
+        x1, y1 = x1 + np.where(is_zero_length, length, dx), y1 + dy
+    
+    return x0, y0, x1, y1
+
+@contextmanager
+def _prepared(geom):
+    """ 
+    Prepare geom for the duration of a with block, so repeated predicates 
+    against it use a spatial index of its edges. 
+    
+    A geom which was already prepared is left prepared afterwards. Note 
+    the prepared geom must be the first argument of binary predicates, 
+    eg. shapely.intersects(geom, others), for it to be used.
+    """
+    was_prepared = shapely.is_prepared(geom)
+    if not was_prepared:
+        shapely.prepare(geom)
+    try:
+        yield geom
+    finally:
+        if not was_prepared:
+            shapely.destroy_prepared(geom)
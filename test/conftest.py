@@ -0,0 +1,17 @@
+import shapely
+
+from shapely_extra import shapes
+
+import pytest
+
+# Shapes shared by the tests of several modules. These are made once per 
+# test run.
+
+@pytest.fixture(scope='session')
+def big_circle():
+    return shapes.circle(center=(100,100), radius=100)
+
+@pytest.fixture(scope='session')
+def joined_circles():
+    """ A long thin shape of 6 overlapping circles along the x axis."""
+    return shapely.union_all([shapes.circle(center=(i, 0), radius=3) for i in [0,5,10,15,20,25]])
@@ -2,15 +2,21 @@ from shapely_extra.angles import (
         radians_to_degrees,
         degrees_to_radians,
         angle_between_points,
+        angle_between_points_array,
         angle_diff,
         angle_between_vectors,
         point_from_angle_and_distance,
         perpendicular_line_at_endpoint,
+        perpendicular_line_at_midpoint,
+        perpendicular_lines,
         )
 
-from shapely.geometry import Point, LineString
+import shapely
+from shapely.geometry import Point, LineString, LinearRing
 from random import choices
-from math import isclose
+from math import isclose, pi
+
+import pytest
 
 
 def test_rad_to_deg():
@@ -23,13 +29,35 @@ def test_angleBetweenPoints_input():
     """A shapely point and tuple should have the same results"""
     ints = range(0,1000)
     k=500
-    points1 = [Point(x,y) for x,y in zip(choices(ints,k=k),choices(ints,k=k))]
-    points2 = [Point(x,y) for x,y in zip(choices(ints,k=k),choices(ints,k=k))]
+    points1 = shapely.points(choices(ints,k=k), choices(ints,k=k))
+    points2 = shapely.points(choices(ints,k=k), choices(ints,k=k))
 
     matches = [angle_between_points(p1,p2) == angle_between_points((p1.x,p1.y),(p2.x,p2.y)) for p1, p2 in zip(points1,points2)]
     print(matches)
     assert all(matches)
 
+def test_angleBetweenPoints_3d():
+    """Only x,y of 3D coordinate tuples should be used"""
+    line = LineString([(0,0,0),(1,1,1),(2,0,5)])
+    assert isclose(angle_between_points((0,0,0),(1,1,1)), pi/4)
+    assert isclose(angle_between_vectors(*line.coords), pi/2, abs_tol=1e-8)
+
+def test_rounded_outputs():
+    """User facing results should not carry trig rounding errors"""
+    assert point_from_angle_and_distance((0,0), 90, 1).equals_exact(Point(0,1), tolerance=0)
+    assert angle_diff(0.1, 0.3) == 0.2
+
+def test_angleBetweenPoints_array():
+    """The array version should match the single point version"""
+    ints = range(-1000,1000)
+    k=500
+    points1 = [(x,y) for x,y in zip(choices(ints,k=k),choices(ints,k=k))]
+    points2 = [(x,y) for x,y in zip(choices(ints,k=k),choices(ints,k=k))]
+    
+    array_angles = angle_between_points_array(points1, points2)
+    matches = [isclose(angle_between_points(p1,p2), a) for p1, p2, a in zip(points1, points2, array_angles)]
+    assert all(matches)
+
 def test_angleBetweenPoints():
     """Input angle for newly generated point should match resulting measured angle"""
     angles = list(range(-179,181,1))
@@ -52,10 +80,16 @@ def test_angleBetweenPoints_around_circle():
     left   = point_from_angle_and_distance(center, angle=180, distance=dist, use_radians=False)
     bottom = point_from_angle_and_distance(center, angle=-90, distance=dist, use_radians=False)
 
-    top_matches = isclose(top.distance(left), top.distance(right))
-    bottom_matches = isclose(bottom.distance(left), bottom.distance(right))
-    left_matches = isclose(left.distance(top), left.distance(bottom))
-    right_matches = isclose(right.distance(top), right.distance(bottom))
+    # Distances from each point to its 2 neighbors, all at once.
+    d = shapely.distance(
+        [top,  top,   bottom, bottom, left, left,   right, right],
+        [left, right, left,   right,  top,  bottom, top,   bottom],
+        )
+    
+    top_matches = isclose(d[0], d[1])
+    bottom_matches = isclose(d[2], d[3])
+    left_matches = isclose(d[4], d[5])
+    right_matches = isclose(d[6], d[7])
 
     assert all([top_matches, bottom_matches, left_matches, right_matches])
     
@@ -81,3 +115,51 @@ def test_perpendicular_length():
     lines_match = [isclose(length,new_line.length,rel_tol=1e-5) for length, new_line in zip(lengths, new_lines)]
 
     assert all(lines_match)
+
+def test_perpendicular_lines_array():
+    """All new lines should have the input length and touch the ref_line endpoint"""
+    ints = range(-1000,1000)
+    k=100
+    lines = [LineString([(x0,y0),(x1,y1),(x2,y2)]) for x0,y0,x1,y1,x2,y2 in zip(*[choices(ints,k=k) for _ in range(6)])]
+    lengths = [l/10 for l in choices(range(1,100), k=k)]
+    
+    for location in ['start','end']:
+        endpoints = [Point(l.coords[-1 if location=='end' else 0]) for l in lines]
+        for attached in ['center','left','right']:
+            new_lines = perpendicular_lines(lines, lengths=lengths, location=location, attached=attached)
+            lengths_match = [isclose(length, new_line.length, rel_tol=1e-5) for length, new_line in zip(lengths, new_lines)]
+            touches_endpoint = [new_line.distance(p) < 1e-9 for new_line, p in zip(new_lines, endpoints)]
+            assert all(lengths_match) and all(touches_endpoint)
+
+def test_perpendicular_line_attached():
+    """Left and right attached lines start on the ref_line endpoint"""
+    line = LineString([(0,0),(5,0)])
+    left_line = perpendicular_line_at_endpoint(line, length=2, location='end', attached='left')
+    right_line = perpendicular_line_at_endpoint(line, length=2, location='end', attached='right')
+    
+    assert left_line.equals_exact(LineString([(5,0),(5,-2)]), tolerance=1e-9)
+    assert right_line.equals_exact(LineString([(5,2),(5,0)]), tolerance=1e-9)
+
+def test_perpendicular_line_at_midpoint():
+    """New line should be centered on the middle point and bisect the 2 segments"""
+    line = LineString([(0,0),(1,1),(2,0)])
+    new_line = perpendicular_line_at_midpoint(line, length=2, location='end', attached='center')
+    
+    assert new_line.equals_exact(LineString([(1,2),(1,0)]), tolerance=1e-9)
+
+def test_perpendicular_lines_inputs():
+    """LinearRings and single lines should work the same as an array of LineStrings"""
+    coords = [(0,0),(5,0),(5,5)]
+    expected = perpendicular_lines([LineString(coords + [(0,0)])], lengths=2)[0]
+    
+    assert perpendicular_lines(LineString(coords + [(0,0)]), lengths=2)[0].equals_exact(expected, tolerance=1e-9)
+    assert perpendicular_lines([LinearRing(coords)], lengths=2)[0].equals_exact(expected, tolerance=1e-9)
+    assert perpendicular_line_at_endpoint(LinearRing(coords), length=2).equals_exact(expected, tolerance=1e-9)
+
+def test_perpendicular_lines_rejects_z():
+    """ 3D ref lines should raise instead of dropping Z"""
+    line = LineString([(0,0,5),(1,1,5),(2,0,5)])
+    with pytest.raises(ValueError):
+        perpendicular_line_at_endpoint(line, 2)
+    with pytest.raises(ValueError):
+        perpendicular_lines([line], 2)
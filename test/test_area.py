@@ -0,0 +1,61 @@
+from shapely_extra import shapes
+from shapely_extra.area import BlockSplitter
+
+import shapely
+from shapely.geometry import MultiPolygon
+
+import numpy as np
+
+import pytest
+
+weights = [0.2, 0.3, 0.5]
+
+@pytest.fixture(scope='module')
+def prepped_splitter(joined_circles):
+    splitter = BlockSplitter(joined_circles, subpolygon_weights=weights, block_size=0.05)
+    splitter.prep_shape()
+    return splitter
+
+@pytest.mark.parametrize('seed', range(5))
+def test_candidate_area_weights(prepped_splitter, seed):
+    """
+    Weights from the area cumulative sum should match those from the
+    union of the sub polygons, including out of order splits.
+    """
+    rng = np.random.default_rng(seed)
+    n_grid_shapes = len(prepped_splitter.grid_shapes)
+    splits = [int(i) for i in rng.integers(0, n_grid_shapes, size=2)]
+
+    for splits_idx in [sorted(splits), sorted(splits, reverse=True)]:
+        union_weights = prepped_splitter._calculate_area_weights(prepped_splitter._make_shapes(splits_idx))
+        candidate_weights = prepped_splitter._candidate_area_weights(splits_idx)
+        assert candidate_weights == pytest.approx(union_weights, abs=1e-9)
+
+def test_candidate_area_weights_2d(prepped_splitter):
+    """ Each row of 2d splits should be scored the same as on its own"""
+    splits_idx = np.array([[10, 50], [50, 10], [0, 0], [20, 200]])
+    weights_2d = prepped_splitter._candidate_area_weights(splits_idx)
+    weights_1d = [prepped_splitter._candidate_area_weights(s) for s in splits_idx]
+    assert weights_2d == pytest.approx(np.array(weights_1d))
+
+@pytest.mark.parametrize('polygon', [
+    shapes.circle(center=(0,0), radius=10),
+    MultiPolygon([shapes.circle(center=(0,0), radius=9.6), shapes.circle(center=(40,2), radius=6.5)]),
+    ])
+def test_block_splitter_final_shapes(polygon):
+    """
+    The final shapes should have areas close to the weights, and together
+    make up the original polygon.
+    """
+    splitter = BlockSplitter(polygon, subpolygon_weights=weights, block_size=0.05)
+    splitter.prep_shape()
+    splitter.optimize_polygon_split()
+    final_shapes = splitter.final_shapes()
+
+    final_areas = shapely.area(final_shapes)
+
+    assert len(final_shapes) == len(weights)
+    assert final_areas / polygon.area == pytest.approx(weights, abs=0.02)
+    assert final_areas.sum() == pytest.approx(polygon.area)
+    assert shapely.union_all(final_shapes).area == pytest.approx(polygon.area)
+    assert splitter._candidate_area_weights(splitter.optimized_splits) == pytest.approx(final_areas / polygon.area)
@@ -1,45 +1,47 @@
 from shapely_extra import shapes
 from shapely_extra import grid
 
+import shapely
 from shapely.ops import unary_union
+from shapely.geometry import MultiPolygon
 
 from math import pi, sqrt
 
-from scipy.spatial import distance
+from scipy.spatial import cKDTree
 
 import pytest
 
-test_shape = shapes.circle(center=(100,100), radius=100)
 primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47]
 
-def test_point_grid_counts():
+def test_point_grid_counts(big_circle):
     """
     A more dense point grid should contain more points.
     """
-    grid1 = grid.point_grid(test_shape, distance=10)
-    grid2 = grid.point_grid(test_shape, distance=8)
+    grid1 = grid.point_grid(big_circle, distance=10)
+    grid2 = grid.point_grid(big_circle, distance=8)
     
     assert len(grid2) > len(grid1)
 
 @pytest.mark.parametrize('point_grid_distance', primes)
-def test_point_grid_distance(point_grid_distance):
+def test_point_grid_distance(point_grid_distance, big_circle):
     """ Measured min distance should equal input"""
-    points = grid.point_grid(test_shape, distance=point_grid_distance)
+    points = grid.point_grid(big_circle, distance=point_grid_distance)
     
     points_xy = [[p.x, p.y] for p in points]
     
-    derived_distances = distance.pdist(points_xy)
+    # The nearest neighbor of each point, other than itself.
+    nearest_distances, _ = cKDTree(points_xy).query(points_xy, k=2)
     
-    assert point_grid_distance == pytest.approx(derived_distances.min())
+    assert point_grid_distance == pytest.approx(nearest_distances[:, 1].min())
     
 @pytest.mark.parametrize('sidelength', primes)
-def test_square_grid_inputs(sidelength):
+def test_square_grid_inputs(sidelength, big_circle):
     """ Equal sidelength/area should produce the same grid"""
-    grid1 = grid.square_grid(test_shape, square_sidelength = sidelength)
-    grid2 = grid.square_grid(test_shape, square_area = sidelength**2)
+    grid1 = grid.square_grid(big_circle, square_sidelength = sidelength)
+    grid2 = grid.square_grid(big_circle, square_area = sidelength**2)
     
     n_polygons_match = len(grid1) == len(grid2)
-    total_area_matches = sum([g.area for g in grid2]) == pytest.approx(sum([g.area for g in grid1]))
+    total_area_matches = shapely.area(grid2).sum() == pytest.approx(shapely.area(grid1).sum())
     assert all([n_polygons_match, total_area_matches])
 
 @pytest.mark.parametrize('sidelength', primes)
@@ -55,7 +57,7 @@ def test_hexagon_grid_centers(sidelength):
             )
         
     grid_n_polygons = [len(g) for g in grid_polygons]
-    grid_area       = [sum([p.area for p in g]) for g in grid_polygons]
+    grid_area       = [shapely.area(g).sum() for g in grid_polygons]
     
     counts_match = all([grid_n_polygons[0] == n for n in grid_n_polygons])
     areas_matches = all([grid_area[0] == pytest.approx(a) for a in grid_area])
@@ -63,26 +65,50 @@ def test_hexagon_grid_centers(sidelength):
     assert all([counts_match, areas_matches])
 
 @pytest.mark.parametrize('grid_method', [grid.square_grid, grid.hexagon_grid])
-def test_grid_derived_area1(grid_method):
+def test_grid_derived_area1(grid_method, big_circle):
     """
     The clip method should ensure that the  total area of all grid
     elements is equal to the area of the original polygon
     """
-    grid_shapes = grid_method(test_shape,5, clip=True)
-    assert unary_union(grid_shapes).area == pytest.approx(test_shape.area)
+    grid_shapes = grid_method(big_circle,5, clip=True)
+    assert unary_union(grid_shapes).area == pytest.approx(big_circle.area)
     
 @pytest.mark.parametrize('grid_method', [grid.square_grid, grid.hexagon_grid])
-def test_grid_derived_area2(grid_method):
+def test_grid_derived_area2(grid_method, big_circle):
     """
     Sum of the area of all grid elements should equal to total area of the
     grid element union.
     This will fail with overlapping polygons within the grid.
     """
-    grid_shapes = grid_method(test_shape,10, clip=True)
-    area1 = sum([s.area for s in grid_shapes])
+    grid_shapes = grid_method(big_circle,10, clip=True)
+    area1 = shapely.area(grid_shapes).sum()
     area2 = unary_union(grid_shapes).area
     assert area1 == pytest.approx(area2)
 
+@pytest.mark.parametrize('sidelength', primes)
+def test_hexagon_grid_shared_edges(sidelength, big_circle):
+    """
+    Neighboring hexagons should share an entire edge, without any
+    gaps or overlaps between them.
+    """
+    grid_shapes = grid.hexagon_grid(big_circle, hexagon_sidelength = sidelength)
+    center_hexagon = [h for h in grid_shapes if h.contains(big_circle.centroid)][0]
+    neighbors = [h for h in grid_shapes if h.intersects(center_hexagon) and h != center_hexagon]
+    shared_edges = [center_hexagon.intersection(h) for h in neighbors]
+    
+    assert len(neighbors) == 6
+    assert all([e.geom_type == 'LineString' for e in shared_edges])
+    assert all([e.length == pytest.approx(sidelength) for e in shared_edges])
 
-
-
+@pytest.mark.parametrize('grid_method', [grid.square_grid, grid.hexagon_grid])
+def test_grid_multipolygon(grid_method):
+    """
+    A grid over a MultiPolygon should have the same elements as the grids 
+    of each part combined.
+    """
+    parts = [shapes.circle(center=(i*300, 0), radius=100) for i in range(3)]
+    multi_grid = grid_method(MultiPolygon(parts), 10, clip=True)
+    part_grid_area = sum([shapely.area(grid_method(p, 10, clip=True)).sum() for p in parts])
+    
+    assert shapely.area(multi_grid).sum() == pytest.approx(part_grid_area)
+    assert shapely.area(multi_grid).sum() == pytest.approx(MultiPolygon(parts).area)
@@ -1,47 +1,58 @@
 from shapely_extra import measure, shapes, angles
-from shapely.ops import unary_union, split
+import shapely
+from shapely.ops import split
+from shapely.geometry import LineString, MultiLineString, MultiPolygon, box
+
+from math import sqrt
 
 import pytest
 
-test_shape = unary_union([shapes.circle(center=(i, 0), radius=3) for i in [0,5,10,15,20,25]])
 
 @pytest.mark.parametrize('n_points', [50,100,200,500])
-def test_major_axis1(n_points):
+def test_major_axis1(n_points, joined_circles):
     """ 
     With the seed and sample points set, the returned line should be the
     same every time.
     """
-    line1 = measure.major_axis(test_shape, n_sample_points = n_points, seed=5)
-    line2 = measure.major_axis(test_shape, n_sample_points = n_points, seed=5)
+    line1 = measure.major_axis(joined_circles, n_sample_points = n_points, seed=5)
+    line2 = measure.major_axis(joined_circles, n_sample_points = n_points, seed=5)
     assert line1 == line2
     
-def test_major_axis2():
+def test_major_axis2(joined_circles):
     """ 
     With different seeds, the axis should be a tad different every time.
     Although functionally they might be the same.
     """
-    line1 = measure.major_axis(test_shape, seed=5)
-    line2 = measure.major_axis(test_shape, seed=6)
+    line1 = measure.major_axis(joined_circles, seed=5)
+    line2 = measure.major_axis(joined_circles, seed=6)
     assert line1 != line2
 
+@pytest.mark.parametrize('sidelength', [0.1, 1, 100])
+def test_major_axis3(sidelength):
+    """ 
+    The major axis of a square is the diagonal.
+    """
+    line = measure.major_axis(shapes.square(sidelength=sidelength))
+    assert line.length == pytest.approx(sidelength * sqrt(2))
+
 @pytest.mark.parametrize('n_points', [50,100,200,500])
-def test_minor_axis1(n_points):
+def test_minor_axis1(n_points, joined_circles):
     """ 
     As long as the seed and n_sample_points are specified, the the minor
     axis should be the same whether or not the initial major axis line
     is passed
     """
-    major_axis_line = measure.major_axis(test_shape, n_sample_points = n_points, seed=5)
-    minor_axis_line1 = measure.minor_axis(test_shape, major_axis_line = major_axis_line, n_sample_points = n_points, seed=5)
-    minor_axis_line2 = measure.minor_axis(test_shape, major_axis_line = None,            n_sample_points = n_points, seed=5)
+    major_axis_line = measure.major_axis(joined_circles, n_sample_points = n_points, seed=5)
+    minor_axis_line1 = measure.minor_axis(joined_circles, major_axis_line = major_axis_line, n_sample_points = n_points, seed=5)
+    minor_axis_line2 = measure.minor_axis(joined_circles, major_axis_line = None,            n_sample_points = n_points, seed=5)
     assert minor_axis_line1 == minor_axis_line2
 
-def test_minor_axis2():
+def test_minor_axis2(joined_circles):
     """
     The minor axis should always perpindicular to the major axis
     """
-    major_axis_line = measure.major_axis(test_shape)
-    minor_axis_line = measure.minor_axis(test_shape, major_axis_line = major_axis_line)
+    major_axis_line = measure.major_axis(joined_circles)
+    minor_axis_line = measure.minor_axis(joined_circles, major_axis_line = major_axis_line)
     
     line_intersection = major_axis_line.intersection(minor_axis_line)
     
@@ -52,3 +63,17 @@ def test_minor_axis2():
         )
     
     assert angles.radians_to_degrees(a) == pytest.approx(90)
+
+def test_merge_lines():
+    """
+    Intersecting a line with a polygon can produce several pieces. Connected
+    pieces should be merged, otherwise the longest piece is kept.
+    """
+    connected = MultiLineString([[(1,0), (3,0)], [(0,0), (1,0)]])
+    gap_shape = MultiPolygon([box(0,0,1,1), box(2,0,5,1)])
+    
+    merged = measure._merge_lines(connected)
+    separate = measure._merge_lines(LineString([(-1,0.5), (6,0.5)]).intersection(gap_shape))
+    
+    assert merged.geom_type == 'LineString' and merged.length == pytest.approx(3)
+    assert separate.geom_type == 'LineString' and separate.length == pytest.approx(3)
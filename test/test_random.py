@@ -5,7 +5,9 @@ from shapely_extra.random import (
     )
 from shapely_extra import shapes
 
+import shapely
 from shapely.ops import unary_union
+from shapely.geometry import LineString
 
 import pytest
 
@@ -23,7 +25,21 @@ def test_random_points_within_polygon2(execution_number):
     """All points within original polygon"""
     polygon = shapes.hexagon((10,10), area=100)
     points = sample_points_in_polygon(polygon, n=500)
-    assert all([p.within(polygon) for p in points])
+    shapely.prepare(polygon)
+    x, y = shapely.get_coordinates(points).T
+    assert shapely.contains_xy(polygon, x, y).all()
+
+def test_random_points_within_polygon_zero_n():
+    """No points are returned for n=0"""
+    polygon = shapes.hexagon((10,10), area=100)
+    assert sample_points_in_polygon(polygon, n=0) == []
+
+def test_random_points_within_thin_polygon():
+    """Polygons covering a small fraction of their bounds still get n points"""
+    polygon = LineString([(0,0), (100,100)]).buffer(0.1)
+    points = sample_points_in_polygon(polygon, n=500, seed=1)
+    x, y = shapely.get_coordinates(points).T
+    assert len(points) == 500 and shapely.contains_xy(polygon, x, y).all()
 
 def test_random_points_within_polygon3():
     """Setting the seed results in the same points"""
@@ -61,7 +77,7 @@ def test_random_polygons3(execution_number):
     original_polygon = shapes.square((10,10), area=100)
     new_polygons = sample_polygons(original_polygon, n=500)
     union_area      = unary_union(new_polygons).area
-    summed_area     = sum([p.area for p in new_polygons])
+    summed_area     = shapely.area(new_polygons).sum()
     assert union_area == pytest.approx(summed_area)
 
 def test_random_polygons4():
@@ -1,4 +1,5 @@
 from shapely_extra import shapes
+from shapely.geometry import Point
 
 from math import pi, sqrt
 
@@ -52,6 +53,45 @@ def test_circle_centroid2():
     derived_center = (initial.centroid.x, initial.centroid.y)
     assert derived_center == pytest.approx(center)
 
+@pytest.mark.parametrize('radius', [0.01, 1, 10, 1000])
+@pytest.mark.parametrize('rel_tolerance', [0.1, 0.01, 1e-4, 1e-6])
+def test_circle_quad_segs(radius, rel_tolerance):
+    """ quad_segs should be the smallest one within the tolerance"""
+    true_area = pi * radius**2
+    tol = true_area * rel_tolerance
+    quad_segs = shapes._required_quad_segs(radius, tol)
+    
+    within_tol = abs(true_area - shapes._circle_polygon_area(quad_segs, radius)) <= tol
+    smaller_not_within_tol = quad_segs==1 or abs(true_area - shapes._circle_polygon_area(quad_segs-1, radius)) > tol
+    assert within_tol and smaller_not_within_tol
+
+@pytest.mark.parametrize('radius', [0.01, 1, 10, 1000])
+@pytest.mark.parametrize('abs_tolerance', [10, 0.1, 1e-3, 1e-6])
+def test_circle_quad_segs_fallback(radius, abs_tolerance):
+    """ quad_segs should match a search over every quad_segs """
+    quad_segs1 = shapes._required_quad_segs(radius, abs_tolerance)
+    quad_segs2 = shapes._required_quad_segs(radius, abs_tolerance, fallback=True)
+    assert quad_segs1 == quad_segs2
+
+@pytest.mark.parametrize('quad_segs', [1, 8, 100])
+def test_circles_match_buffer(quad_segs):
+    """ Circles made from the cached unit circle should match a buffered Point"""
+    centers_x, centers_y = [0, -500, 123.4], [0, 250, -0.1]
+    circles = shapes._circles(centers_x, centers_y, radius=7.5, quad_segs=quad_segs)
+    buffered = [Point(x,y).buffer(7.5, quad_segs=quad_segs) for x,y in zip(centers_x, centers_y)]
+    assert all([c.equals_exact(b, tolerance=1e-9) for c,b in zip(circles, buffered)])
+
+@pytest.mark.parametrize('radius', [0, -1])
+def test_circle_non_positive_radius(radius):
+    """ A radius <= 0 should give an empty polygon, like Point.buffer"""
+    c = shapes.circle(radius=radius)
+    assert c.is_empty and c.geom_type == 'Polygon'
+
+@pytest.mark.parametrize('center', [Point(1,2), (1,2), (1,2,3), [1,2]])
+def test_circle_center_types(center):
+    """ Any center Point() accepts should work"""
+    c = shapes.circle(center=center, radius=2)
+    assert (c.centroid.x, c.centroid.y) == pytest.approx((1,2))
 
 def test_square_area1():
     length = 1000
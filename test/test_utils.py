@@ -1,6 +1,8 @@
-from shapely.geometry import Point, LineString
+import numpy as np
+import shapely
+from shapely.geometry import Point, LineString, LinearRing, box
 
-from shapely_extra.utils import extend_line
+from shapely_extra.utils import extend_line, extend_lines, extend_lines_xy, _prepared
 
 import pytest
 
@@ -41,4 +43,110 @@ def test_extend_line_length1():
     assert all([
         new_l.length == pytest.approx(new_length)
         for new_l in new_lines
-        ])
\ No newline at end of file
+        ])
+
+@pytest.mark.parametrize('side', ['start','end','both'])
+def test_extend_lines_matches_extend_line(side):
+    """ The array version should match the single line version"""
+    lines = [
+        LineString([(-1,-1), (1,1)]),
+        LineString([(0,0), (3,1), (5,-2)]),
+        LineString([(10,10), (10,20), (20,20), (20,10)]),
+        LinearRing([(0,0), (0,1), (1,1)]),
+        ]
+    lengths = [1, 0.5, 7, 2]
+    
+    new_lines = extend_lines(lines, length=lengths, side=side)
+    single_lines = [extend_line(l, length=length, side=side) for l, length in zip(lines, lengths)]
+    
+    assert all([
+        new_l.equals_exact(single_l, tolerance=1e-9)
+        for new_l, single_l in zip(new_lines, single_lines)
+        ])
+    
+    # A single line is treated as an array of 1
+    new_line = extend_lines(lines[1], length=lengths[1], side=side)
+    assert len(new_line) == 1 and new_line[0].equals_exact(single_lines[1], tolerance=1e-9)
+
+@pytest.mark.parametrize('side', ['start','end','both'])
+def test_extend_lines_xy_matches_extend_line(side):
+    """ The coordinate array version should match the single line version"""
+    x0, y0 = np.array([-1, 0, 10]), np.array([-1, 0, 10])
+    x1, y1 = np.array([1, 3, 10]), np.array([1, 1, 20])
+    lengths = np.array([1, 0.5, 7])
+    
+    new_x0, new_y0, new_x1, new_y1 = extend_lines_xy(x0, y0, x1, y1, length=lengths, side=side)
+    single_lines = [extend_line(LineString([(a,b),(c,d)]), length=length, side=side) for a,b,c,d,length in zip(x0, y0, x1, y1, lengths)]
+    
+    assert np.allclose(new_x0, [l.coords[0][0] for l in single_lines])
+    assert np.allclose(new_y0, [l.coords[0][1] for l in single_lines])
+    assert np.allclose(new_x1, [l.coords[-1][0] for l in single_lines])
+    assert np.allclose(new_y1, [l.coords[-1][1] for l in single_lines])
+
+def test_extend_lines_xy_broadcasts():
+    """ Scalar coordinates and lengths of a different shape should broadcast"""
+    new_x0, new_y0, new_x1, new_y1 = extend_lines_xy(0, 0, 1, 0, 2)
+    assert (new_x0, new_y0, new_x1, new_y1) == pytest.approx((-1, 0, 2, 0))
+    
+    new_x0, new_y0, new_x1, new_y1 = extend_lines_xy(0, 0, 1, 0, [[2], [4]], side='end')
+    assert new_x1.shape == (2, 1)
+    assert new_x1.ravel() == pytest.approx([3, 5])
+
+@pytest.mark.parametrize('side', ['start','end','both'])
+def test_extend_line_repeated_end_vertex(side):
+    """ A zero length end segment is extended along the x-axis, without any nan"""
+    l = LineString([(1,1), (1,1), (2,2), (2,2)])
+    expected = {
+        'start' : [(2,1), (1,1), (1,1), (2,2), (2,2)],
+        'end'   : [(1,1), (1,1), (2,2), (2,2), (3,2)],
+        'both'  : [(1.5,1), (1,1), (1,1), (2,2), (2,2), (2.5,2)],
+        }[side]
+    
+    new_line = extend_line(l, length=1, side=side)
+    new_lines = extend_lines([l], length=1, side=side)
+    assert new_line.equals_exact(LineString(expected), tolerance=1e-9)
+    assert new_lines[0].equals_exact(LineString(expected), tolerance=1e-9)
+    
+    new_x0, new_y0, new_x1, new_y1 = extend_lines_xy([1], [1], [1], [1], length=1, side=side)
+    added_length = 0.5 if side == 'both' else 1
+    expected_x0 = 1 + added_length if side in ['start','both'] else 1
+    expected_x1 = 1 + added_length if side in ['end','both'] else 1
+    assert (new_x0[0], new_y0[0], new_x1[0], new_y1[0]) == pytest.approx((expected_x0, 1, expected_x1, 1))
+
+def test_extend_line_bad_side():
+    """ An unknown side should raise a ValueError"""
+    l = LineString([Point(-1,-1), Point(1,1)])
+    with pytest.raises(ValueError):
+        extend_line(l, length=1, side='middle')
+    with pytest.raises(ValueError):
+        extend_lines([l], length=1, side='middle')
+
+@pytest.mark.parametrize('length, length_frac', [(None, None), (0, None), (-1, None), (None, -0.5)])
+def test_extend_line_bad_length(length, length_frac):
+    """ A missing or non-positive length should raise a ValueError"""
+    l = LineString([Point(-1,-1), Point(1,1)])
+    with pytest.raises(ValueError):
+        extend_line(l, length=length, length_frac=length_frac)
+    with pytest.raises(ValueError):
+        extend_lines([l], length=length, length_frac=length_frac)
+
+def test_prepared_is_restored():
+    """ A polygon should only stay prepared if it was prepared beforehand"""
+    unprepared = box(0,0,1,1)
+    with _prepared(unprepared):
+        prepared_within = shapely.is_prepared(unprepared)
+    assert prepared_within and not shapely.is_prepared(unprepared)
+    
+    prepared = box(0,0,1,1)
+    shapely.prepare(prepared)
+    with _prepared(prepared):
+        pass
+    assert shapely.is_prepared(prepared)
+
+def test_extend_line_rejects_z():
+    """ Z values can't be extended, so 3D lines should raise"""
+    line = LineString([(0,0,5),(1,1,5),(2,0,5)])
+    with pytest.raises(ValueError):
+        extend_line(line, length=2)
+    with pytest.raises(ValueError):
+        extend_lines([line], length=2)